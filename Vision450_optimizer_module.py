@@ -4,7 +4,7 @@ import numpy as np
 
 from datetime import datetime, timedelta
 from physics_module import PETPhysicsModel
-from data_persistence import KFactorStore
+from data_persistence import KFactorStore, SessionLog
 from ui_components import PETUIComponents
 
 # Initialize components
@@ -22,15 +22,7 @@ def main():
 
     # Inputs
     tracer_label, weight_kg, height_cm, gender, scan_range_mm = ui.patient_study_inputs()
-    injected_activity_mbq, inj_time_str, start_time_str, residual_mbq = ui.activity_time_inputs()
-
-    # Parse times
-    try:
-        inj_time = datetime.strptime(inj_time_str, "%Y-%m-%d %H:%M")
-        scan_start = datetime.strptime(start_time_str, "%Y-%m-%d %H:%M")
-    except Exception:
-        st.error("Formato de fecha/hora inválido. Use AAAA-MM-DD HH:MM")
-        st.stop()
+    injected_activity_mbq, inj_time, scan_start, residual_mbq = ui.activity_time_inputs()
 
     # Check if patient is pediatric
     is_pediatric = (gender == "pediatric")
@@ -85,17 +77,18 @@ def main():
         k_mode = "k calibrado de referencia (sin BMI)"
 
     # Compute protocols with pediatric considerations
+    session = physics_model.prepare_session(k, config['recon_gain'], tkey)
     std_v, std_t, std_time, std_snr, std_cov, std_hit = physics_model.solve_standard(
         A_eff, k, config['recon_gain'], snr_target_case, mult_bmi, scan_range_mm, 
-        is_pediatric=is_pediatric, weight_kg=weight_kg, height_cm=height_cm, tracer=tkey)
+        is_pediatric=is_pediatric, weight_kg=weight_kg, height_cm=height_cm, tracer=tkey, session=session)
     
     low_A, low_v, low_t, low_time, low_snr, low_cov, low_ok = physics_model.solve_lowdose(
         ld_dpk, weight_kg, k, config['recon_gain'], snr_target_case, mult_bmi, scan_range_mm, 
-        is_pediatric=is_pediatric, height_cm=height_cm, tracer=tkey)
+        is_pediatric=is_pediatric, height_cm=height_cm, tracer=tkey, session=session)
     
     fast_v, fast_t, fast_time, fast_snr, fast_cov = physics_model.solve_fast(
         A_eff, k, config['recon_gain'], mult_bmi, t_ref_fast, scan_range_mm, 
-        is_pediatric=is_pediatric, weight_kg=weight_kg, height_cm=height_cm, tracer=tkey)
+        is_pediatric=is_pediatric, weight_kg=weight_kg, height_cm=height_cm, tracer=tkey, session=session)
 
     # Prepare data for display
     patient_data = {
@@ -164,8 +157,8 @@ def main():
             st.warning("No hay datos almacenados para este trazador/recon.")
 
     # Session log & CSV export
-    if "runs" not in st.session_state:
-        st.session_state["runs"] = []
+    if not isinstance(st.session_state.get("runs"), SessionLog):
+        st.session_state["runs"] = SessionLog()
     
     st.session_state["runs"].append({
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M"),
@@ -1,32 +1,132 @@
 import json
+import math
+import os
+import statistics
 from pathlib import Path
 import numpy as np
 
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:  # orjson es opcional; el formato numérico puede diferir, no los valores
+    def _dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    _loads = json.loads
+
 class KFactorStore:
-    def __init__(self, store_file="k_store.json"):
+    def __init__(self, store_file="k_store.jsonl"):
         self.store_file = Path(store_file)
+        # Formato anterior (un único dict JSON), se lee si aún no hay .jsonl. Un store_file
+        # .json (el valor por defecto anterior) se migra al .jsonl del mismo nombre
+        self.legacy_file = self.store_file.with_suffix(".json")
+        if self.store_file == self.legacy_file:
+            self.store_file = self.store_file.with_suffix(".jsonl")
+        # Último contenido leído y (ruta, mtime): evita re-parsear en cada rerun
+        self._cache = None
+        self._cache_key = None
 
-    def load_store(self):
-        if self.store_file.exists():
+    def _parse(self, path):
+        raw = path.read_bytes()
+        if path == self.legacy_file:
+            # json estándar: el .json anterior puede contener NaN/Infinity, que orjson rechaza
+            legacy = json.loads(raw)
+            return {key: [k for k in vals if math.isfinite(k)] for key, vals in legacy.items()}
+        data = {}
+        for line in raw.splitlines():
             try:
-                data = json.loads(self.store_file.read_text(encoding="utf-8"))
-                return data
+                rec = _loads(line)
+                k = float(rec["k"])
+                if math.isfinite(k):
+                    data.setdefault(rec["key"], []).append(k)
             except Exception:
-                return {}
-        return {}
+                # Línea incompleta o corrupta (o sin "key"): se ignora
+                continue
+        return data
+
+    def load_store(self):
+        """
+        Devuelve {'<tracer>_<recon>': [k1, k2, ...]}. Mientras el archivo no cambie se
+        devuelve el MISMO dict en cada llamada (compartido entre sesiones de Streamlit):
+        no modificarlo salvo a través de add_k_measurement/save_store.
+        """
+        path = self.store_file
+        if not path.exists() and self.legacy_file.exists():
+            path = self.legacy_file
+        try:
+            key = (path, path.stat().st_mtime_ns)
+        except OSError:
+            return {}
+        if key == self._cache_key:
+            return self._cache
+        try:
+            data = self._parse(path)
+        except Exception:
+            return {}
+        self._cache = data
+        self._cache_key = key
+        return data
+
+    def _remember(self, store):
+        self._cache = store
+        self._cache_key = (self.store_file, self.store_file.stat().st_mtime_ns)
+
+    @staticmethod
+    def _record(key, k_value):
+        return _dumps({"key": key, "k": float(k_value)}) + b"\n"
 
     def save_store(self, store):
+        # Escritura atómica: un corte a mitad de escritura no deja el almacén truncado
+        tmp = self.store_file.with_suffix(self.store_file.suffix + ".tmp")
         try:
-            self.store_file.write_text(json.dumps(store, indent=2), encoding="utf-8")
+            lines = b"".join(self._record(key, k) for key, vals in store.items() for k in vals
+                             if math.isfinite(k))
+            with tmp.open("wb") as f:
+                f.write(lines)
+                # Datos en disco antes del rename: si no, un corte de luz puede dejar el
+                # rename persistido sobre un archivo vacío
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.store_file)
+            self._remember(store)
         except Exception:
-            pass
+            try:
+                tmp.unlink(missing_ok=True)
+            except OSError:
+                pass
 
     def add_k_measurement(self, store, tracer, recon_profile, k_value):
+        if not math.isfinite(float(k_value)):
+            # NaN/inf no se guardan: orjson los escribiría como null y json como NaN
+            return store
         key = f"{tracer}_{recon_profile}"
         arr = store.get(key, [])
         arr.append(float(k_value))
         store[key] = arr
-        self.save_store(store)
+        if not self.store_file.exists():
+            # Primera escritura: vuelca todo (incluye migración del .json anterior)
+            self.save_store(store)
+            return store
+        try:
+            before = (self.store_file, self.store_file.stat().st_mtime_ns)
+            with self.store_file.open("a+b") as f:
+                record = self._record(key, k_value)
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        # Última línea truncada: el registro nuevo va en su propia línea
+                        record = b"\n" + record
+                f.write(record)
+            if store is self._cache and before == self._cache_key:
+                # Nadie más escribió desde nuestra última lectura: el caché sigue completo
+                self._cache_key = (self.store_file, self.store_file.stat().st_mtime_ns)
+            else:
+                # Otro escritor agregó registros: forzar re-lectura en el próximo load_store
+                self._cache_key = None
+        except Exception:
+            self._cache_key = None
         return store
 
     def summarize_k(self, store, tracer, recon_profile):
@@ -34,9 +134,37 @@ class KFactorStore:
         vals = store.get(key, [])
         if not vals:
             return None
-        a = np.array(vals)
-        return float(np.median(a)), float(np.percentile(a, 25)), float(np.percentile(a, 75)), len(a)
+        n = len(vals)
+        if n == 1:
+            q25 = q50 = q75 = vals[0]
+        elif n < 32:
+            # Pocos valores: sin crear ndarray; 'inclusive' = interpolación lineal de np.quantile
+            q25, q50, q75 = statistics.quantiles(vals, n=4, method="inclusive")
+        else:
+            # np.quantile copia su entrada: un ndarray paralelo a la lista no evitaría esa
+            # copia y quedaría desfasado si la lista se edita in situ
+            q25, q50, q75 = np.quantile(np.array(vals), [0.25, 0.5, 0.75])
+        return float(q50), float(q25), float(q75), n
 
     def get_site_k_summary(self, tracer, recon_profile):
         store = self.load_store()
-        return self.summarize_k(store, tracer, recon_profile)
\ No newline at end of file
+        return self.summarize_k(store, tracer, recon_profile)
+
+
+class SessionLog:
+    """Bitácora de sesión por columnas: {columna: [valores]} para armar el DataFrame sin iterar filas."""
+
+    def __init__(self):
+        self.columns = {}
+        self._n = 0
+
+    def append(self, row):
+        for col, vals in self.columns.items():
+            vals.append(row.get(col))
+        for col, val in row.items():
+            if col not in self.columns:
+                self.columns[col] = [None] * self._n + [val]
+        self._n += 1
+
+    def __len__(self):
+        return self._n
\ No newline at end of file
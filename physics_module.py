@@ -1,14 +1,127 @@
+import math
 import numpy as np
 from datetime import datetime, timedelta
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba es opcional: sin él los núcleos corren en Python puro
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+    prange = range
+
+
+@lru_cache(maxsize=32)
+def _tracer_key(name):
+    return "PSMA" if "PSMA" in str(name).upper() else "FDG"
+
+
+@dataclass(frozen=True)
+class SessionConsts:
+    """Constantes de los solvers fijas mientras no cambien k, recon ni trazador"""
+    k: float
+    recon_gain: float
+    tracer: str        # clave normalizada ("FDG" / "PSMA")
+    sens: float        # cps/MBq
+    k_floor_rg: float  # max(k, 1e-9) * recon_gain (NEC requerido)
+    axfov: float       # mm
+
+
+# ----------- Núcleos numéricos de los solvers (compilados con numba si está disponible) -----------
+# Sin fastmath: los núcleos usan math.inf como tope y devuelven NaN como COV, y el
+# resultado debe ser idéntico con y sin numba.
+
+
+@njit(cache=True)
+def _clamped_speed_core(t_bed, axfov):
+    v = axfov / max(t_bed, 1e-6)
+    return max(0.5, min(v, 50.0))
+
+
+@njit(cache=True)
+def _required_speed_core(A_mbq, k_floor_rg, snr_target_case, mult_bmi, sens, axfov, max_scan_time):
+    nec_req = (snr_target_case / k_floor_rg) ** 2
+    t_bed = nec_req / (max(A_mbq * sens, 1e-6)) * mult_bmi
+    t_bed = min(t_bed, max_scan_time)
+    return _clamped_speed_core(t_bed, axfov)
+
+
+def _round_speed(v, axfov):
+    # Fuera de numba: su round() desempata distinto que el de CPython
+    v = round(v, 1)
+    return v, axfov / v
+
+
+def _round_speed_batch(v, axfov):
+    """_round_speed elemento a elemento sobre un ndarray"""
+    # np.round (rint(10·v)/10) solo difiere de round() de CPython cerca de un empate x.x5:
+    # esos pocos elementos se redondean con round()
+    r = np.array(np.round(v, 1), dtype=float)
+    near = np.abs((v * 10.0) % 1.0 - 0.5) < 1e-6
+    if near.any():
+        r[near] = [round(x, 1) for x in np.asarray(v)[near].tolist()]
+    r = r[()]  # escalar si v era escalar, como np.round
+    return r, axfov / r
+
+
+@njit(cache=True)
+def _predict_core(activity_mbq, t_bed_r, k, recon_gain, sens):
+    nec = activity_mbq * t_bed_r * sens
+    snr_pred = k * (math.sqrt(max(nec, 1e-9)) * recon_gain)
+    cov_pred = 1.0 / snr_pred if snr_pred > 0 else math.nan
+    return snr_pred, cov_pred
+
+
+def _solve_standard_core(A_mbq, k, recon_gain, k_floor_rg, snr_target_case, mult_bmi, scan_range_mm, sens, axfov,
+                         max_scan_time):
+    v_raw = _required_speed_core(A_mbq, k_floor_rg, snr_target_case, mult_bmi, sens, axfov, max_scan_time)
+    v, t_bed_r = _round_speed(v_raw, axfov)
+    snr_pred, cov_pred = _predict_core(A_mbq, t_bed_r, k, recon_gain, sens)
+    return v, t_bed_r, (scan_range_mm / v) / 60.0, snr_pred, cov_pred, abs(snr_pred - snr_target_case) <= 0.3
+
+
+def _solve_fast_core(A_eff_mbq, k, recon_gain, t_bed_fast, scan_range_mm, sens, axfov):
+    v, t_bed_r = _round_speed(_clamped_speed_core(t_bed_fast, axfov), axfov)
+    snr_pred, cov_pred = _predict_core(A_eff_mbq, t_bed_r, k, recon_gain, sens)
+    return v, t_bed_r, (scan_range_mm / v) / 60.0, snr_pred, cov_pred
+
+
+@njit(parallel=True, cache=True)
+def _sweep_speed_core(A_mbq, k_floor_rg, snr_target_case, mult_bmi, max_scan_time, sens, axfov, out_v):
+    for i in prange(A_mbq.shape[0]):
+        out_v[i] = _required_speed_core(A_mbq[i], k_floor_rg[i], snr_target_case[i], mult_bmi[i],
+                                        sens, axfov, max_scan_time[i])
+
+
+@njit(parallel=True, cache=True)
+def _sweep_predict_core(A_mbq, t_bed_r, k, recon_gain, sens, out_snr, out_cov):
+    for i in prange(A_mbq.shape[0]):
+        snr_pred, cov_pred = _predict_core(A_mbq[i], t_bed_r[i], k[i], recon_gain[i], sens)
+        out_snr[i] = snr_pred
+        out_cov[i] = cov_pred
+
 
 class PETPhysicsModel:
+    # Tablas envueltas en MappingProxyType (ver __getstate__)
+    _READ_ONLY_TABLES = ("HALF_LIFE_MIN", "LAMBDA_MIN", "PEDIATRIC_WEIGHT_RANGES", "PEDIATRIC_DOSE_FACTORS",
+                         "PEDIATRIC_SCAN_TIME_LIMITS", "PEDIATRIC_LBM_FACTORS")
+
     def __init__(self):
         # Constantes del Vision 450
         self.AXFOV_MM = 263.0  # campo de visión axial (mm)
-        self.HALF_LIFE_MIN = {
+        # Solo lectura: LAMBDA_MIN se deriva de aquí una sola vez
+        self.HALF_LIFE_MIN = MappingProxyType({
             "FDG": 109.77,          # F-18 FDG
             "PSMA": 109.77,         # F-18 PSMA-1007
-        }
+        })
+        # Constante de decaimiento λ = ln2 / T½ (1/min)
+        self.LAMBDA_MIN = MappingProxyType({k: math.log(2.0) / v for k, v in self.HALF_LIFE_MIN.items()})
 
         # SNR objetivos
         self.SNR_TARGET_DEFAULT = {"FDG": 12.0, "PSMA": 14.0}
@@ -28,42 +141,55 @@ class PETPhysicsModel:
         }
 
         # PEDIATRIC CONSIDERATIONS
-        self.PEDIATRIC_WEIGHT_RANGES = {
+        # Tablas de solo lectura: _ped_profiles se deriva de ellas una sola vez
+        self.PEDIATRIC_WEIGHT_RANGES = MappingProxyType({
             "neonate": (0.5, 5.0),
             "infant": (5.0, 15.0),
             "toddler": (15.0, 25.0),
             "child": (25.0, 50.0),
             "adolescent": (50.0, 100.0)
-        }
+        })
 
-        self.PEDIATRIC_DOSE_FACTORS = {
+        self.PEDIATRIC_DOSE_FACTORS = MappingProxyType({
             "neonate": 0.02,
             "infant": 0.05,
             "toddler": 0.10,
             "child": 0.15,
             "adolescent": 0.75
-        }
+        })
 
         self.PEDIATRIC_SNR_TARGETS = {
             "FDG": 8.0,
             "PSMA": 10.0
         }
 
-        self.PEDIATRIC_SCAN_TIME_LIMITS = {
+        self.PEDIATRIC_SCAN_TIME_LIMITS = MappingProxyType({
             "neonate": 30.0,
             "infant": 60.0,
             "toddler": 120.0,
             "child": 180.0,
             "adolescent": 240.0
-        }
+        })
 
-        self.PEDIATRIC_LBM_FACTORS = {
+        self.PEDIATRIC_LBM_FACTORS = MappingProxyType({
             "neonate": 0.85,
             "infant": 0.80,
             "toddler": 0.75,
             "child": 0.70,
             "adolescent": 0.65
-        }
+        })
+
+        # Rangos pediátricos contiguos → bordes superiores ordenados (para bisect) y una
+        # fila (grupo, factor de dosis, límite de tiempo, factor LBM) por grupo
+        ranges = list(self.PEDIATRIC_WEIGHT_RANGES.values())
+        if (any(hi <= lo for lo, hi in ranges)
+                or any(lo != prev_hi for (_, prev_hi), (lo, _) in zip(ranges, ranges[1:]))):
+            raise ValueError("PEDIATRIC_WEIGHT_RANGES debe ser contiguo y ordenado por peso")
+        self._ped_min_w = ranges[0][0]
+        self._ped_edges = tuple(hi for _, hi in ranges)
+        self._ped_profiles = tuple(
+            (g, self.PEDIATRIC_DOSE_FACTORS[g], self.PEDIATRIC_SCAN_TIME_LIMITS[g], self.PEDIATRIC_LBM_FACTORS[g])
+            for g in self.PEDIATRIC_WEIGHT_RANGES)
 
         # UPTAKE TIME DEFAULTS (now used as fallbacks)
         self.DEFAULT_UPTAKE_TIMES = {
@@ -71,8 +197,18 @@ class PETPhysicsModel:
             "PSMA": 90    # minutes
         }
 
+    def __getstate__(self):
+        # mappingproxy no se puede serializar: pickle/deepcopy (st.session_state, st.cache_data)
+        # guardan las tablas de solo lectura como dict y __setstate__ las vuelve a envolver
+        return {name: dict(val) if name in self._READ_ONLY_TABLES else val
+                for name, val in self.__dict__.items()}
+
+    def __setstate__(self, state):
+        self.__dict__.update({name: MappingProxyType(val) if name in self._READ_ONLY_TABLES else val
+                              for name, val in state.items()})
+
     def tracer_key(self, name: str) -> str:
-        return "PSMA" if "PSMA" in str(name).upper() else "FDG"
+        return _tracer_key(name)
 
     def get_system_sensitivity(self, tracer: str) -> float:
         """Sensibilidad base (literatura confirmada) en cps/MBq"""
@@ -82,10 +218,9 @@ class PETPhysicsModel:
     def recon_gain_val(self, profile, custom_gain=None):
         if custom_gain is not None and custom_gain > 0:
             return float(custom_gain)
-        # FIXED: Safe access to RECON_PROFILES
-        profile_map = {"EARL": "EARL", "OSEM_TOF": "OSEM_TOF", "HD_PET": "HD_PET"}
-        mapped_profile = profile_map.get(profile, "HD_PET")
-        return self.RECON_PROFILES[mapped_profile]["gain"]
+        # Perfil desconocido → HD_PET (lectura directa: respeta ediciones del sitio)
+        profiles = self.RECON_PROFILES
+        return profiles.get(profile, profiles["HD_PET"])["gain"]
 
     def calculate_uptake_time_minutes(self, inj_time, scan_start, tracer="FDG"):
         """
@@ -122,21 +257,32 @@ class PETPhysicsModel:
         # Calculate actual uptake time
         uptake_time_min = self.calculate_uptake_time_minutes(inj_time, scan_start, tracer)
         
-        # Get half-life for tracer
-        half_life = self.HALF_LIFE_MIN[self.tracer_key(tracer)]
-        lam = np.log(2) / half_life
+        # Decay constant for tracer
+        lam = self.LAMBDA_MIN[self.tracer_key(tracer)]
         
         # Apply decay correction
         dt_min = max(uptake_time_min, 0.0)
         A0 = max(injected_mbq - residual_mbq, 0.0)
-        return A0 * np.exp(-lam * dt_min)
+        return A0 * math.exp(-lam * dt_min)
+
+    def _pediatric_index(self, weight_kg):
+        """Índice del grupo pediátrico en _ped_profiles, o None"""
+        idx = bisect_left(self._ped_edges, weight_kg)
+        if weight_kg >= self._ped_min_w and idx < len(self._ped_edges):
+            return idx
+        return None
+
+    def _pediatric_profile(self, weight_kg):
+        """(grupo, factor de dosis, límite de tiempo, factor LBM) con una sola búsqueda"""
+        idx = self._pediatric_index(weight_kg)
+        if idx is None:
+            return None, 1.0, 180.0, None
+        return self._ped_profiles[idx]
 
     def get_pediatric_age_group(self, weight_kg):
         """Determine pediatric age group based on weight"""
-        for group, (min_w, max_w) in self.PEDIATRIC_WEIGHT_RANGES.items():
-            if min_w <= weight_kg <= max_w:
-                return group
-        return None
+        idx = self._pediatric_index(weight_kg)
+        return self._ped_profiles[idx][0] if idx is not None else None
 
     def is_pediatric_patient(self, weight_kg):
         """Check if patient is likely pediatric"""
@@ -144,31 +290,24 @@ class PETPhysicsModel:
 
     def get_pediatric_dose_factor(self, weight_kg):
         """Get appropriate dose factor for pediatric patients"""
-        age_group = self.get_pediatric_age_group(weight_kg)
-        if age_group:
-            return self.PEDIATRIC_DOSE_FACTORS.get(age_group, 0.15)
-        return 1.0
+        return self._pediatric_profile(weight_kg)[1]
 
     def get_pediatric_snr_target(self, tracer, weight_kg):
         """Get appropriate SNR target for pediatric patients"""
         base_target = self.PEDIATRIC_SNR_TARGETS.get(tracer, 8.0)
-        dose_factor = self.get_pediatric_dose_factor(weight_kg)
+        _, dose_factor, _, _ = self._pediatric_profile(weight_kg)
         adjusted_target = base_target * (0.8 + 0.4 * (dose_factor / 0.15))
         return max(5.0, min(12.0, adjusted_target))
 
     def get_pediatric_scan_time_limit(self, weight_kg):
         """Get maximum recommended scan time for pediatric patients"""
-        age_group = self.get_pediatric_age_group(weight_kg)
-        if age_group:
-            return self.PEDIATRIC_SCAN_TIME_LIMITS.get(age_group, 180.0)
-        return 180.0
+        return self._pediatric_profile(weight_kg)[2]
 
     def calculate_lbm(self, weight_kg, height_cm, gender="male"):
         # PEDIATRIC LBM CALCULATION
         if self.is_pediatric_patient(weight_kg):
-            age_group = self.get_pediatric_age_group(weight_kg)
-            if age_group:
-                lbm_factor = self.PEDIATRIC_LBM_FACTORS.get(age_group, 0.70)
+            _, _, _, lbm_factor = self._pediatric_profile(weight_kg)
+            if lbm_factor is not None:
                 return weight_kg * lbm_factor
             else:
                 if weight_kg < 10:
@@ -200,7 +339,7 @@ class PETPhysicsModel:
         return activity_mbq * dwell_time_s * sens
 
     def calculate_snr_from_nec(self, nec, recon_gain=1.6):
-        return np.sqrt(max(nec, 1e-9)) * recon_gain
+        return math.sqrt(max(nec, 1e-9)) * recon_gain
 
     def calibrate_k_from_reference(self, t_ref_std_s, A_ref_mbq, recon_gain, snr_ref_site, tracer="FDG", weight_kg=70, height_cm=170):
         """
@@ -208,82 +347,196 @@ class PETPhysicsModel:
         """
         sens = self.get_system_sensitivity(tracer)
         nec_ref = A_ref_mbq * t_ref_std_s * sens
-        sqrt_nec_ref = np.sqrt(max(nec_ref, 1e-9))
+        sqrt_nec_ref = math.sqrt(max(nec_ref, 1e-9))
         k = snr_ref_site / (sqrt_nec_ref * recon_gain)
         return float(max(k, 1e-9))
 
     # ----------- Solvers de protocolo -----------
 
+    def prepare_session(self, k, recon_gain, tracer="FDG"):
+        """
+        Precalcula las constantes de los solvers para un k/recon/trazador dados.
+        Pasarlas como session= evita recalcularlas en cada solver.
+        """
+        k = float(k)
+        recon_gain = float(recon_gain)
+        return SessionConsts(
+            k=k,
+            recon_gain=recon_gain,
+            tracer=self.tracer_key(tracer),
+            sens=self.get_system_sensitivity(tracer),
+            k_floor_rg=max(k, 1e-9) * recon_gain,
+            axfov=self.AXFOV_MM,
+        )
+
+    def _session_for(self, k, recon_gain, tracer, session):
+        """Devuelve session validada contra k/recon_gain/tracer, o una nueva si es None"""
+        if session is None:
+            return self.prepare_session(k, recon_gain, tracer)
+        if (session.k != float(k) or session.recon_gain != float(recon_gain)
+                or session.tracer != self.tracer_key(tracer) or session.axfov != self.AXFOV_MM):
+            raise ValueError("session no corresponde a k/recon_gain/tracer: usar prepare_session con los mismos valores")
+        return session
+
     def solve_standard(self, A_eff_mbq, k, recon_gain, snr_target_case, mult_bmi, scan_range_mm, 
-                      tracer="FDG", is_pediatric=False, weight_kg=None, height_cm=None):
-        nec_req = (snr_target_case / (max(k, 1e-9) * recon_gain)) ** 2
-        sens = self.get_system_sensitivity(tracer)
-        t_bed = nec_req / (max(A_eff_mbq * sens, 1e-6)) * mult_bmi
+                      tracer="FDG", is_pediatric=False, weight_kg=None, height_cm=None, session=None):
+        session = self._session_for(k, recon_gain, tracer, session)
 
         # PEDIATRIC SCAN TIME LIMITATION
+        max_scan_time = math.inf
         if is_pediatric and weight_kg is not None:
             max_scan_time = self.get_pediatric_scan_time_limit(weight_kg)
-            t_bed = min(t_bed, max_scan_time)
-
-        v = self.AXFOV_MM / max(t_bed, 1e-6)
-        v = max(0.5, min(v, 50.0))
-        v = round(v, 1)
-        t_bed_r = self.AXFOV_MM / v
 
-        nec = self.calculate_nec(A_eff_mbq, t_bed_r, tracer)
-        snr_pred = k * self.calculate_snr_from_nec(nec, recon_gain)
-        cov_pred = 1.0 / snr_pred if snr_pred > 0 else np.nan
-
-        return v, t_bed_r, (scan_range_mm / v) / 60.0, snr_pred, cov_pred, abs(snr_pred - snr_target_case) <= 0.3
+        return _solve_standard_core(float(A_eff_mbq), session.k, session.recon_gain, session.k_floor_rg,
+                                    float(snr_target_case), float(mult_bmi), float(scan_range_mm),
+                                    session.sens, session.axfov, float(max_scan_time))
 
     def solve_lowdose(self, low_dpk, weight_kg, k, recon_gain, snr_target_case, mult_bmi, scan_range_mm, 
-                     tracer="FDG", is_pediatric=False, height_cm=None):
-        # PEDIATRIC DOSE ADJUSTMENT
+                     tracer="FDG", is_pediatric=False, height_cm=None, session=None):
+        session = self._session_for(k, recon_gain, tracer, session)
+
+        # PEDIATRIC DOSE ADJUSTMENT + SCAN TIME LIMITATION
         if is_pediatric:
-            dose_factor = self.get_pediatric_dose_factor(weight_kg)
+            _, dose_factor, max_scan_time, _ = self._pediatric_profile(weight_kg)
             A_low = float(low_dpk) * float(weight_kg) * dose_factor
         else:
+            max_scan_time = math.inf
             A_low = float(low_dpk) * float(weight_kg)
-            
-        nec_req = (snr_target_case / (max(k, 1e-9) * recon_gain)) ** 2
-        sens = self.get_system_sensitivity(tracer)
-        t_bed = nec_req / (max(A_low * sens, 1e-6)) * mult_bmi
 
-        # PEDIATRIC SCAN TIME LIMITATION
-        if is_pediatric:
-            max_scan_time = self.get_pediatric_scan_time_limit(weight_kg)
-            t_bed = min(t_bed, max_scan_time)
-
-        v = self.AXFOV_MM / max(t_bed, 1e-6)
-        v = max(0.5, min(v, 50.0))
-        v = round(v, 1)
-        t_bed_r = self.AXFOV_MM / v
-
-        nec = self.calculate_nec(A_low, t_bed_r, tracer)
-        snr_pred = k * self.calculate_snr_from_nec(nec, recon_gain)
-        cov_pred = 1.0 / snr_pred if snr_pred > 0 else np.nan
+        v, t_bed_r, t_min, snr_pred, cov_pred, _ = _solve_standard_core(
+            A_low, session.k, session.recon_gain, session.k_floor_rg, float(snr_target_case), float(mult_bmi),
+            float(scan_range_mm), session.sens, session.axfov, float(max_scan_time))
         feasible = (v > 0.5 + 1e-6)
 
-        return A_low, v, t_bed_r, (scan_range_mm / v) / 60.0, snr_pred, cov_pred, feasible
+        return A_low, v, t_bed_r, t_min, snr_pred, cov_pred, feasible
 
     def solve_fast(self, A_eff_mbq, k, recon_gain, mult_bmi, fast_t_ref_s, scan_range_mm, 
-                  tracer="FDG", is_pediatric=False, weight_kg=None, height_cm=None):
+                  tracer="FDG", is_pediatric=False, weight_kg=None, height_cm=None, session=None):
+        session = self._session_for(k, recon_gain, tracer, session)
+
         t_bed_fast = float(fast_t_ref_s) * mult_bmi
 
         # PEDIATRIC FAST PROTOCOL ADJUSTMENT
         if is_pediatric and weight_kg is not None:
-            reduction_factor = 0.5 + 0.3 * (self.get_pediatric_dose_factor(weight_kg) / 0.15)
+            _, dose_factor, scan_time_limit, _ = self._pediatric_profile(weight_kg)
+            reduction_factor = 0.5 + 0.3 * (dose_factor / 0.15)
             t_bed_fast = t_bed_fast * reduction_factor
-            max_scan_time = self.get_pediatric_scan_time_limit(weight_kg) * 0.5
+            max_scan_time = scan_time_limit * 0.5
             t_bed_fast = min(t_bed_fast, max_scan_time)
 
-        v = self.AXFOV_MM / max(t_bed_fast, 1e-6)
-        v = max(0.5, min(v, 50.0))
-        v = round(v, 1)
-        t_bed_r = self.AXFOV_MM / v
+        return _solve_fast_core(float(A_eff_mbq), session.k, session.recon_gain, float(t_bed_fast),
+                                float(scan_range_mm), session.sens, session.axfov)
+
+    # ----------- Solvers vectorizados (lotes de pacientes) -----------
+
+    def _pediatric_table_batch(self, weight_kg, table, default):
+        """Equivalente vectorizado de _pediatric_index + table[grupo]"""
+        w = np.asarray(weight_kg, dtype=float)
+        values = np.array([table[g] for g, *_ in self._ped_profiles])
+        idx = np.searchsorted(self._ped_edges, w, side="left")
+        valid = (w >= self._ped_min_w) & (idx < len(values))
+        return np.where(valid, values[np.minimum(idx, len(values) - 1)], default)
+
+    def _bed_speed_batch(self, t_bed):
+        v = np.clip(self.AXFOV_MM / np.maximum(t_bed, 1e-6), 0.5, 50.0)
+        return _round_speed_batch(v, self.AXFOV_MM)
+
+    def _predict_snr_batch(self, activity_mbq, t_bed_r, k, recon_gain, sens):
+        nec = activity_mbq * t_bed_r * sens
+        # Misma asociación que _predict_core: k * (sqrt(nec) * recon_gain)
+        snr_pred = k * (np.sqrt(np.maximum(nec, 1e-9)) * recon_gain)
+        with np.errstate(divide="ignore"):
+            cov_pred = np.where(snr_pred > 0, 1.0 / snr_pred, np.nan)
+        return snr_pred, cov_pred
+
+    def solve_standard_batch(self, A_eff_mbq, k, recon_gain, snr_target_case, mult_bmi, scan_range_mm,
+                             tracer="FDG", is_pediatric=False, weight_kg=None):
+        """solve_standard sobre arreglos (escalares o arrays, con broadcasting)"""
+        A_eff_mbq = np.asarray(A_eff_mbq, dtype=float)
+        k = np.asarray(k, dtype=float)
+        snr_target_case = np.asarray(snr_target_case, dtype=float)
+        nec_req = (snr_target_case / (np.maximum(k, 1e-9) * recon_gain)) ** 2
+        sens = self.get_system_sensitivity(tracer)
+        t_bed = nec_req / np.maximum(A_eff_mbq * sens, 1e-6) * mult_bmi
+
+        if weight_kg is not None:
+            max_scan_time = self._pediatric_table_batch(weight_kg, self.PEDIATRIC_SCAN_TIME_LIMITS, 180.0)
+            t_bed = np.where(is_pediatric, np.minimum(t_bed, max_scan_time), t_bed)
+
+        v, t_bed_r = self._bed_speed_batch(t_bed)
+        snr_pred, cov_pred = self._predict_snr_batch(A_eff_mbq, t_bed_r, k, recon_gain, sens)
+
+        return v, t_bed_r, (scan_range_mm / v) / 60.0, snr_pred, cov_pred, np.abs(snr_pred - snr_target_case) <= 0.3
+
+    def solve_lowdose_batch(self, low_dpk, weight_kg, k, recon_gain, snr_target_case, mult_bmi, scan_range_mm,
+                            tracer="FDG", is_pediatric=False):
+        """solve_lowdose sobre arreglos (escalares o arrays, con broadcasting)"""
+        weight_kg = np.asarray(weight_kg, dtype=float)
+        k = np.asarray(k, dtype=float)
+        dose_factor = self._pediatric_table_batch(weight_kg, self.PEDIATRIC_DOSE_FACTORS, 1.0)
+        A_low = np.asarray(low_dpk, dtype=float) * weight_kg * np.where(is_pediatric, dose_factor, 1.0)
+
+        nec_req = (np.asarray(snr_target_case, dtype=float) / (np.maximum(k, 1e-9) * recon_gain)) ** 2
+        sens = self.get_system_sensitivity(tracer)
+        t_bed = nec_req / np.maximum(A_low * sens, 1e-6) * mult_bmi
+
+        max_scan_time = self._pediatric_table_batch(weight_kg, self.PEDIATRIC_SCAN_TIME_LIMITS, 180.0)
+        t_bed = np.where(is_pediatric, np.minimum(t_bed, max_scan_time), t_bed)
+
+        v, t_bed_r = self._bed_speed_batch(t_bed)
+        snr_pred, cov_pred = self._predict_snr_batch(A_low, t_bed_r, k, recon_gain, sens)
+        feasible = v > 0.5 + 1e-6
 
-        nec = self.calculate_nec(A_eff_mbq, t_bed_r, tracer)
-        snr_pred = k * self.calculate_snr_from_nec(nec, recon_gain)
-        cov_pred = 1.0 / snr_pred if snr_pred > 0 else np.nan
+        return A_low, v, t_bed_r, (scan_range_mm / v) / 60.0, snr_pred, cov_pred, feasible
+
+    def solve_fast_batch(self, A_eff_mbq, k, recon_gain, mult_bmi, fast_t_ref_s, scan_range_mm,
+                         tracer="FDG", is_pediatric=False, weight_kg=None):
+        """solve_fast sobre arreglos (escalares o arrays, con broadcasting)"""
+        A_eff_mbq = np.asarray(A_eff_mbq, dtype=float)
+        t_bed_fast = np.asarray(fast_t_ref_s, dtype=float) * mult_bmi
+
+        if weight_kg is not None:
+            dose_factor = self._pediatric_table_batch(weight_kg, self.PEDIATRIC_DOSE_FACTORS, 1.0)
+            max_scan_time = self._pediatric_table_batch(weight_kg, self.PEDIATRIC_SCAN_TIME_LIMITS, 180.0) * 0.5
+            t_ped = np.minimum(t_bed_fast * (0.5 + 0.3 * (dose_factor / 0.15)), max_scan_time)
+            t_bed_fast = np.where(is_pediatric, t_ped, t_bed_fast)
+
+        v, t_bed_r = self._bed_speed_batch(t_bed_fast)
+        sens = self.get_system_sensitivity(tracer)
+        snr_pred, cov_pred = self._predict_snr_batch(A_eff_mbq, t_bed_r, k, recon_gain, sens)
 
-        return v, t_bed_r, (scan_range_mm / v) / 60.0, snr_pred, cov_pred
\ No newline at end of file
+        return v, t_bed_r, (scan_range_mm / v) / 60.0, snr_pred, cov_pred
+
+    def solve_standard_sweep(self, A_eff_mbq, k, recon_gain, snr_target_case, mult_bmi, scan_range_mm,
+                             tracer="FDG", is_pediatric=False, weight_kg=None):
+        """
+        Igual que solve_standard_batch, pero recorre los pacientes con los núcleos escalares
+        en paralelo (numba prange); el redondeo de velocidad se hace fuera, con el de CPython,
+        así que cada paciente da lo mismo que solve_standard. Pensado para barridos grandes.
+        """
+        k = np.asarray(k, dtype=float)
+        recon_gain = np.asarray(recon_gain, dtype=float)
+        if weight_kg is not None:
+            limits = self._pediatric_table_batch(weight_kg, self.PEDIATRIC_SCAN_TIME_LIMITS, 180.0)
+            max_scan_time = np.where(is_pediatric, limits, np.inf)
+        else:
+            max_scan_time = np.inf
+
+        args = np.broadcast_arrays(
+            np.asarray(A_eff_mbq, dtype=float), k, recon_gain, np.maximum(k, 1e-9) * recon_gain,
+            np.asarray(snr_target_case, dtype=float), np.asarray(mult_bmi, dtype=float),
+            np.asarray(scan_range_mm, dtype=float), np.asarray(max_scan_time, dtype=float))
+        shape = args[0].shape
+        A, k, recon_gain, k_floor_rg, snr_t, mult, scan_range, max_t = (
+            np.ascontiguousarray(a, dtype=np.float64).ravel() for a in args)
+        sens = float(self.get_system_sensitivity(tracer))
+
+        n = A.shape[0]
+        v = np.empty(n)
+        _sweep_speed_core(A, k_floor_rg, snr_t, mult, max_t, sens, self.AXFOV_MM, v)
+        # round() de CPython, como _round_speed en solve_standard
+        v, t_bed_r = _round_speed_batch(v, self.AXFOV_MM)
+        snr_pred, cov_pred = np.empty(n), np.empty(n)
+        _sweep_predict_core(A, t_bed_r, k, recon_gain, sens, snr_pred, cov_pred)
+        out = (v, t_bed_r, (scan_range / v) / 60.0, snr_pred, cov_pred, np.abs(snr_pred - snr_t) <= 0.3)
+        return tuple(o.reshape(shape) for o in out)
\ No newline at end of file
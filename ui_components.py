@@ -2,36 +2,37 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
 
+# Default values in case physics_model is not available
+DEFAULT_SNR_REF_SITE = {"FDG": 12.0, "PSMA": 14.0}
+DEFAULT_SNR_TARGET = {"FDG": 12.0, "PSMA": 14.0}
+DEFAULT_RECON_PROFILES = {
+    "EARL": {"gain": 1.0, "note": "EARL armonizado"},
+    "OSEM_TOF": {"gain": 1.25, "note": "OSEM+TOF sin PSF (sitio dependiente)"},
+    "HD_PET": {"gain": 1.6, "note": "TOF+PSF+filtro (Vision)"},
+}
+
 class PETUIComponents:
     def __init__(self, physics_model=None):
         self.physics_model = physics_model
+        # Configuración inmutable: se resuelve una vez, no en cada rerun del sidebar
+        self._snr_ref_site_default = getattr(physics_model, 'SNR_REF_SITE_DEFAULT', DEFAULT_SNR_REF_SITE)
+        self._snr_target_default = getattr(physics_model, 'SNR_TARGET_DEFAULT', DEFAULT_SNR_TARGET)
+        self._recon_profiles = getattr(physics_model, 'RECON_PROFILES', DEFAULT_RECON_PROFILES)
+        self._recon_profile_names = list(self._recon_profiles)
+        self._recon_gain_val = getattr(physics_model, 'recon_gain_val', None)
 
     def sidebar_configuration(self):
-        # Default values in case physics_model is not available
-        SNR_REF_SITE_DEFAULT = {"FDG": 12.0, "PSMA": 14.0}
-        SNR_TARGET_DEFAULT = {"FDG": 12.0, "PSMA": 14.0}
-        RECON_PROFILES = {
-            "EARL": {"gain": 1.0, "note": "EARL armonizado"},
-            "OSEM_TOF": {"gain": 1.25, "note": "OSEM+TOF sin PSF (sitio dependiente)"},
-            "HD_PET": {"gain": 1.6, "note": "TOF+PSF+filtro (Vision)"},
-        }
-        
-        # Use physics_model values if available
-        if self.physics_model is not None:
-            if hasattr(self.physics_model, 'SNR_REF_SITE_DEFAULT'):
-                SNR_REF_SITE_DEFAULT = self.physics_model.SNR_REF_SITE_DEFAULT
-            if hasattr(self.physics_model, 'SNR_TARGET_DEFAULT'):
-                SNR_TARGET_DEFAULT = self.physics_model.SNR_TARGET_DEFAULT
-            if hasattr(self.physics_model, 'RECON_PROFILES'):
-                RECON_PROFILES = self.physics_model.RECON_PROFILES
+        SNR_REF_SITE_DEFAULT = self._snr_ref_site_default
+        SNR_TARGET_DEFAULT = self._snr_target_default
+        RECON_PROFILES = self._recon_profiles
 
         st.sidebar.header("Reconstrucción")
-        recon_profile = st.sidebar.selectbox("Perfil", list(RECON_PROFILES.keys()), index=2)
+        recon_profile = st.sidebar.selectbox("Perfil", self._recon_profile_names, index=2)
         custom_gain = st.sidebar.number_input("Gain personalizado (opcional)", 0.0, 5.0, 0.0, 0.1)
         
         # Calculate recon_gain
-        if self.physics_model is not None and hasattr(self.physics_model, 'recon_gain_val'):
-            recon_gain = self.physics_model.recon_gain_val(recon_profile, None if custom_gain==0 else custom_gain)
+        if self._recon_gain_val is not None:
+            recon_gain = self._recon_gain_val(recon_profile, None if custom_gain==0 else custom_gain)
         else:
             # Fallback calculation
             profile_gain = RECON_PROFILES[recon_profile]["gain"]
@@ -110,13 +111,19 @@ class PETUIComponents:
         c5, c6, c7 = st.columns(3)
         with c5:
             injected_activity_mbq = st.number_input("Actividad inyectada (MBq)", 1.0, 600.0, 280.0, 1.0)
+        now = datetime.now().replace(second=0, microsecond=0)
+        start_default = now + timedelta(minutes=60)
         with c6:
-            inj_time_str = st.text_input("Hora de inyección (AAAA-MM-DD HH:MM)", datetime.now().strftime("%Y-%m-%d %H:%M"))
+            inj_date = st.date_input("Fecha de inyección", now.date())
+            inj_clock = st.time_input("Hora de inyección", now.time(), step=60)
         with c7:
-            start_time_str = st.text_input("Inicio adquisición (AAAA-MM-DD HH:MM)", (datetime.now()+timedelta(minutes=60)).strftime("%Y-%m-%d %H:%M"))
+            start_date = st.date_input("Fecha inicio adquisición", start_default.date())
+            start_clock = st.time_input("Hora inicio adquisición", start_default.time(), step=60)
         residual_mbq = st.number_input("Residual (MBq) tras inyección", 0.0, 50.0, 0.0, 0.5)
 
-        return injected_activity_mbq, inj_time_str, start_time_str, residual_mbq
+        inj_time = datetime.combine(inj_date, inj_clock)
+        scan_start = datetime.combine(start_date, start_clock)
+        return injected_activity_mbq, inj_time, scan_start, residual_mbq
 
     def display_results(self, patient_data, activity_data, recon_data):
         # Summaries
@@ -151,9 +158,9 @@ class PETUIComponents:
         st.divider()
         st.markdown("#### Bitácora de sesión")
         if runs_data and len(runs_data) > 0:  # Check if there's data
-            df = pd.DataFrame(runs_data)
+            df = pd.DataFrame(runs_data.columns, copy=False)
             st.dataframe(df, use_container_width=True)
-            csv = df.to_csv(index=False).encode('utf-8')
-            st.download_button("Descargar CSV", data=csv, file_name="vision450_session_log.csv", mime="text/csv")
+            # El CSV se genera solo al pulsar el botón, no en cada rerun
+            st.download_button("Descargar CSV", data=lambda: df.to_csv(index=False).encode('utf-8'), file_name="vision450_session_log.csv", mime="text/csv")
         else:
             st.info("No hay datos de sesión disponibles")
\ No newline at end of file